@@ -36,6 +36,7 @@ void PrintUsage(const char* prog) {
     fprintf(stderr, "  --image <path>       Single image path (detection mode)\n");
     fprintf(stderr, "  --track              Enable tracking mode (reads paths from stdin)\n");
     fprintf(stderr, "  --images-file <path> File containing image paths, one per line\n");
+    fprintf(stderr, "  --raw <WxH>          Treat input frames as raw BGR dumps of WxH pixels\n");
     fprintf(stderr, "  --conf <float>       Confidence threshold (default: 0.5)\n");
     fprintf(stderr, "  --nms <float>        NMS IoU threshold (default: 0.4)\n");
     fprintf(stderr, "  --iou <float>        Tracking IoU threshold (default: 0.15)\n");
@@ -162,29 +163,43 @@ int RunDetection(const std::string& model_dir, const std::string& image_path,
     return SUCCESS;
 }
 
-// Run multi-frame tracking
+// Run multi-frame tracking. Paths come from `images_file`, or from stdin when
+// it is empty.
 int RunTracking(const std::string& model_dir,
-                const std::vector<std::string>& image_paths,
+                const std::string& images_file,
                 float conf_thresh, float iou_thresh,
                 float detection_fps, float video_fps,
                 const std::string& reid_model_dir,
                 float reid_weight,
-                float reid_cos_thresh) {
-    
-    if (image_paths.empty()) {
-        fprintf(stderr, "Error: No image paths provided\n");
-        return ERR_NO_INPUT;
-    }
-    
-    // Create pipeline
+                float reid_cos_thresh,
+                int raw_width, int raw_height) {
+
+    // Create the pipeline (and load the SCRFD/ReID models) before consuming
+    // stdin: when an upstream extractor streams paths into us, model load
+    // overlaps its remaining decode work instead of waiting for EOF.
     FacePipeline pipeline(model_dir, conf_thresh, detection_fps, iou_thresh,
                           reid_model_dir, reid_weight, reid_cos_thresh);
-    
+    if (raw_width > 0 && raw_height > 0) {
+        pipeline.setRawInput(raw_width, raw_height);
+    }
+
     if (!pipeline.isLoaded()) {
         fprintf(stderr, "Error: Failed to load model from %s\n", model_dir.c_str());
         return ERR_MODEL_NOT_FOUND;
     }
-    
+
+    std::vector<std::string> image_paths;
+    if (!images_file.empty()) {
+        image_paths = ReadPathsFromFile(images_file);
+    } else {
+        image_paths = ReadPathsFromStdin();
+    }
+
+    if (image_paths.empty()) {
+        fprintf(stderr, "Error: No image paths provided\n");
+        return ERR_NO_INPUT;
+    }
+
     // Process frames
     PipelineResult result = pipeline.process(image_paths, video_fps);
     
@@ -281,6 +296,8 @@ int main(int argc, char** argv) {
     float video_fps = 30.0f;
     float reid_weight = 0.35f;
     float reid_cos_thresh = 0.35f;
+    int raw_width = 0;
+    int raw_height = 0;
 
     // Parse arguments
     for (int i = 1; i < argc; ++i) {
@@ -295,6 +312,12 @@ int main(int argc, char** argv) {
         } else if (strcmp(argv[i], "--images-file") == 0 && i + 1 < argc) {
             images_file = argv[++i];
             track_mode = true;
+        } else if (strcmp(argv[i], "--raw") == 0 && i + 1 < argc) {
+            if (sscanf(argv[++i], "%dx%d", &raw_width, &raw_height) != 2 ||
+                raw_width <= 0 || raw_height <= 0) {
+                fprintf(stderr, "Error: --raw expects <WxH>, e.g. --raw 1920x1080\n");
+                return ERR_INVALID_ARGS;
+            }
         } else if (strcmp(argv[i], "--conf") == 0 && i + 1 < argc) {
             conf_thresh = static_cast<float>(atof(argv[++i]));
         } else if (strcmp(argv[i], "--nms") == 0 && i + 1 < argc) {
@@ -330,18 +353,11 @@ int main(int argc, char** argv) {
 
     // Determine mode and run
     if (track_mode) {
-        // Tracking mode
-        std::vector<std::string> image_paths;
-        
-        if (!images_file.empty()) {
-            image_paths = ReadPathsFromFile(images_file);
-        } else {
-            image_paths = ReadPathsFromStdin();
-        }
-        
-        return RunTracking(model_dir, image_paths, conf_thresh, iou_thresh,
+        // Tracking mode (RunTracking reads paths after the models are loaded)
+        return RunTracking(model_dir, images_file, conf_thresh, iou_thresh,
                           detection_fps, video_fps,
-                          reid_model_dir, reid_weight, reid_cos_thresh);
+                          reid_model_dir, reid_weight, reid_cos_thresh,
+                          raw_width, raw_height);
     } else if (!image_path.empty()) {
         // Single image detection mode
         return RunDetection(model_dir, image_path, conf_thresh, nms_thresh);
@@ -57,6 +57,37 @@ inline bool LoadRgbFrame(const std::string& path, LoadedRgbFrame& out) {
     return true;
 }
 
+// Raw BGR frame dump (written by the extractor with ndarray.tofile).
+// Geometry comes from the --raw flag; no decoder involved.
+inline bool LoadRawBgrFrame(const std::string& path, int w, int h, LoadedRgbFrame& out) {
+    out = LoadedRgbFrame{};
+    if (w <= 0 || h <= 0) return false;
+    const size_t expected = static_cast<size_t>(w) * static_cast<size_t>(h) * 3u;
+    std::ifstream f(path.c_str(), std::ios::binary);
+    if (!f.is_open()) return false;
+    out.rgb.resize(expected);
+    f.read(reinterpret_cast<char*>(out.rgb.data()), static_cast<std::streamsize>(expected));
+    if (static_cast<size_t>(f.gcount()) != expected) {
+        out = LoadedRgbFrame{};
+        return false;
+    }
+    // OpenCV dumps BGR; downstream (detector, GMC, ReID) expects RGB.
+    for (size_t i = 0; i < expected; i += 3) {
+        std::swap(out.rgb[i], out.rgb[i + 2]);
+    }
+    out.w = w;
+    out.h = h;
+    return true;
+}
+
+// Dispatch on input mode: raw BGR dumps when a geometry is set, stb decode otherwise.
+inline bool LoadFrame(const std::string& path, int raw_w, int raw_h, LoadedRgbFrame& out) {
+    if (raw_w > 0 && raw_h > 0) {
+        return LoadRawBgrFrame(path, raw_w, raw_h, out);
+    }
+    return LoadRgbFrame(path, out);
+}
+
 inline float clampf(float v, float lo, float hi) {
     return std::max(lo, std::min(hi, v));
 }
@@ -169,14 +200,16 @@ std::vector<Detection> FacePipeline::detectSingle(const std::string& image_path,
     if (!detector_.IsLoaded()) {
         return result;
     }
-    
+
     // Load image
-    int channels;
-    unsigned char* rgb = stbi_load(image_path.c_str(), &width, &height, &channels, 3);
-    if (!rgb) {
+    LoadedRgbFrame frame;
+    if (!LoadFrame(image_path, raw_width_, raw_height_, frame)) {
         return result;
     }
-    
+    width = frame.w;
+    height = frame.h;
+    const unsigned char* rgb = frame.rgb.data();
+
     // Detect faces
     std::vector<ScrfdFace> faces = detector_.Detect(rgb, width, height);
     
@@ -203,8 +236,6 @@ std::vector<Detection> FacePipeline::detectSingle(const std::string& image_path,
     // track births downstream.
     result = NmsDetections(std::move(result), 0.30f);
 
-    stbi_image_free(rgb);
-    
     return result;
 }
 
@@ -300,7 +331,7 @@ PipelineResult FacePipeline::process(const std::vector<std::string>& image_paths
     
     for (int i = 0; i < result.frame_count; ++i) {
         LoadedRgbFrame cur_frame;
-        const bool cur_ok = LoadRgbFrame(image_paths[i], cur_frame);
+        const bool cur_ok = LoadFrame(image_paths[i], raw_width_, raw_height_, cur_frame);
         if (cur_ok) gmc_frame_load_ok++;
         Mat3f warp_prev_to_curr = Mat3f::Identity();
         bool warp_ok = false;
@@ -68,6 +68,16 @@ public:
      * Check if pipeline is ready (model loaded successfully).
      */
     bool isLoaded() const { return detector_.IsLoaded(); }
+
+    /**
+     * Treat input frames as raw BGR byte dumps of the given size instead of
+     * encoded images. Skips the image decoder entirely; the extractor script
+     * writes frames this way to avoid a per-frame JPEG encode/decode round trip.
+     */
+    void setRawInput(int width, int height) {
+        raw_width_ = width;
+        raw_height_ = height;
+    }
     
     /**
      * Process a list of image frames.
@@ -93,6 +103,8 @@ public:
 private:
     ScrfdDetector detector_;
     float conf_thresh_;
+    int raw_width_ = 0;   // >0: frames are raw BGR dumps of this geometry
+    int raw_height_ = 0;
     float detection_fps_;
     float iou_thresh_;
 
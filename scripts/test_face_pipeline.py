@@ -16,8 +16,59 @@ import os
 import subprocess
 import sys
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+try:
+    import orjson  # optional: much faster (de)serialization of tracking JSON
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+# Lazily imported cv2 module (see _require_cv2).
+_cv2: Any = None
+
+
+def _require_cv2() -> Any:
+    """Import cv2 on first use and cache the module.
+
+    Keeps startup free of the heavyweight OpenCV import for code paths that
+    never touch it, and runs the probe (with its install hint) once per
+    process instead of in every function that needs cv2.
+    """
+    global _cv2
+    if _cv2 is None:
+        try:
+            import cv2
+        except ImportError as e:
+            raise RuntimeError(
+                "opencv-python is not installed. Install with: pip install opencv-python"
+            ) from e
+        _cv2 = cv2
+    return _cv2
+
+
+def _loads_tracking(text: bytes | str) -> Any:
+    """Parse tracking JSON, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    return json.loads(text)
+
+
+def _dump_tracking(data: Any, path: Path) -> None:
+    """Write tracking JSON (indented for debugging), preferring orjson."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
 
 
 # -----------------------------------------------------------------------------
@@ -53,48 +104,99 @@ def _get_env_float(name: str, default: float) -> float:
         return default
 
 
-def extract_frames(video_path: str, output_dir: Path) -> Tuple[List[str], float, int, int]:
+def extract_frames(video_path: str, output_dir: Path) -> Tuple[Iterator[str], float, int, int]:
     """Extract frames from video to output directory.
-    
+
+    Frames are written as raw BGR byte dumps (``frame_NNNNNN.bgr``) rather than
+    JPEG: the C++ stage re-reads every frame, and encoding + decoding JPEG per
+    frame costs far more than the plain memory copy. Frame geometry is recorded
+    once in a ``frames_meta.json`` sidecar next to the frames.
+
+    Extraction is lazy: the returned iterator yields each frame path once its
+    write has completed, so the caller can feed a downstream stage while later
+    frames are still being decoded.
+
     Returns:
-        Tuple of (frame_paths, fps, width, height)
+        Tuple of (frame_iter, fps, width, height)
+
+    Raises:
+        ValueError: If the video contains no decodable frames.
     """
-    try:
-        import cv2
-    except ImportError as e:
-        raise RuntimeError(
-            "opencv-python is not installed. Install with: pip install opencv-python"
-        ) from e
-    
-    cap = cv2.VideoCapture(video_path)
+    cv2 = _require_cv2()
+
+    # Ask the FFmpeg backend for a hardware decoder (VideoToolbox on macOS,
+    # NVDEC/VAAPI elsewhere) when the OpenCV build supports the hint; FFmpeg
+    # falls back to software decode on its own if none is available.
+    cap = None
+    if hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+        cap = cv2.VideoCapture(
+            video_path,
+            cv2.CAP_FFMPEG,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+        )
+        if not cap.isOpened():
+            cap.release()
+            cap = None
+    if cap is None:
+        cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"Failed to open video: {video_path}")
-    
+
     fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
-    
-    frame_paths: List[str] = []
-    frame_count = 0
-    
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_filename = output_dir / f"frame_{frame_count:06d}.jpg"
-            cv2.imwrite(str(frame_filename), frame)
-            frame_paths.append(str(frame_filename))
-            frame_count += 1
-            
-            if frame_count % 30 == 0:
-                print(f"Extracted {frame_count} frames...", file=sys.stderr)
-    finally:
+
+    # Decode the first frame eagerly: it pins down the real geometry (container
+    # metadata can be missing or wrong) before any downstream stage starts.
+    ret, first_frame = cap.read()
+    if not ret:
         cap.release()
-    
-    print(f"Extracted {frame_count} frames total", file=sys.stderr)
-    return frame_paths, fps, width, height
+        raise ValueError("No frames extracted from video")
+    height, width = first_frame.shape[:2]
+    meta = {"width": width, "height": height, "channels": 3, "dtype": "uint8"}
+    (output_dir / "frames_meta.json").write_text(json.dumps(meta))
+
+    def frames() -> Iterator[str]:
+        frame = first_frame
+        frame_count = 0
+        # Decode has to stay sequential (VideoCapture is not thread-safe), but
+        # the frame writes are independent, so hand them to a small pool and
+        # let disk I/O overlap the next frame's decode. Each cap.read()
+        # returns a fresh array, so workers never race the decode loop. Paths
+        # are yielded in decode order, only once their write has finished.
+        pending: deque = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as pool:
+                while True:
+                    # tofile requires a C-contiguous array; decoded frames
+                    # normally are, but guard against strided views so the
+                    # dump never falls over (and stays a single memcpy).
+                    if not frame.flags["C_CONTIGUOUS"]:
+                        frame = np.ascontiguousarray(frame)
+                    frame_filename = str(output_dir / f"frame_{frame_count:06d}.bgr")
+                    pending.append((pool.submit(frame.tofile, frame_filename), frame_filename))
+                    frame_count += 1
+
+                    while pending and pending[0][0].done():
+                        future, path = pending.popleft()
+                        future.result()
+                        yield path
+
+                    if frame_count % 30 == 0:
+                        print(f"Extracted {frame_count} frames...", file=sys.stderr)
+
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+
+                while pending:
+                    future, path = pending.popleft()
+                    future.result()
+                    yield path
+        finally:
+            cap.release()
+
+        print(f"Extracted {frame_count} frames total", file=sys.stderr)
+
+    return frames(), fps, width, height
 
 
 # -----------------------------------------------------------------------------
@@ -102,25 +204,30 @@ def extract_frames(video_path: str, output_dir: Path) -> Tuple[List[str], float,
 # -----------------------------------------------------------------------------
 
 def run_face_pipeline(
-    frame_paths: List[str],
+    frame_paths: Iterable[str],
     model_dir: str,
     reid_model_dir: str | None,
     video_fps: float,
     detection_fps: float = 10.0,
     conf_thresh: float = 0.5,
     iou_thresh: float = 0.15,
+    raw_size: Tuple[int, int] | None = None,
 ) -> Dict[str, Any]:
     """Run the C++ face_pipeline executable and return tracking results.
-    
+
     Args:
-        frame_paths: List of frame image paths
+        frame_paths: Frame image paths in frame order; may be a lazy iterator,
+            in which case paths are streamed to the executable as they become
+            available so extraction and the C++ stage overlap
         model_dir: Directory containing scrfd.param and scrfd.bin
         reid_model_dir: Optional directory containing MobileFaceNet ncnn files
         video_fps: Source video FPS
         detection_fps: Detection sampling rate
         conf_thresh: Confidence threshold
         iou_thresh: Tracking IoU threshold
-    
+        raw_size: (width, height) when frames are raw BGR dumps instead of
+            encoded images (see extract_frames)
+
     Returns:
         Parsed JSON output with tracks
     """
@@ -144,12 +251,12 @@ def run_face_pipeline(
         "--iou", str(iou_thresh),
     ]
 
+    if raw_size is not None:
+        cmd += ["--raw", f"{raw_size[0]}x{raw_size[1]}"]
+
     if reid_model_dir and Path(reid_model_dir).exists():
         cmd += ["--reid-model", reid_model_dir]
-    
-    # Prepare frame paths as input (one per line)
-    frame_input = "\n".join(frame_paths).encode("utf-8")
-    
+
     # Set up environment for dynamic library loading (macOS/Linux)
     env = os.environ.copy()
     executable_dir = str(Path(executable_path).parent)
@@ -157,6 +264,12 @@ def run_face_pipeline(
     env["FACE_PIPELINE_LOG_GMC"] = "1"
     env["FACE_PIPELINE_LOG_REID"] = "1"
 
+    # Keep idle OpenMP workers in the child from spin-waiting while it blocks
+    # on stdin or frame I/O. Inference itself runs after extraction has
+    # finished (the parent is idle by then), so the native stage keeps the
+    # full core count; setdefault leaves room for an environment override.
+    env.setdefault("OMP_WAIT_POLICY", "PASSIVE")
+
     blur_skip = _get_env_float("FACE_PIPELINE_REID_BLUR_SKIP_VAR", 12.0)
     blur_sharpen = _get_env_float("FACE_PIPELINE_REID_BLUR_SHARPEN_VAR", 50.0)
     lap_alpha = _get_env_float("FACE_PIPELINE_REID_LAPLACIAN_ALPHA", 0.6)
@@ -186,68 +299,143 @@ def run_face_pipeline(
     # Windows: DLLs in the same directory as .exe are found automatically
     
     print("Running face_pipeline executable...", file=sys.stderr)
+
+    # Start the executable immediately and stream frame paths into its stdin as
+    # the caller produces them. The child loads its models before reading stdin
+    # to EOF, so with a lazy frame_paths iterator process startup + model load
+    # overlap the remaining extraction work; detection itself begins once all
+    # paths have been streamed.
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    assert proc.stdin is not None and proc.stdout is not None and proc.stderr is not None
+
+    # Drain stdout/stderr from threads so the child never blocks on a full pipe
+    # while we are still writing its stdin.
+    stdout_chunks: List[bytes] = []
+    stderr_chunks: List[bytes] = []
+
+    def _drain(stream: Any, chunks: List[bytes]) -> None:
+        chunks.append(stream.read())
+
+    readers = [
+        threading.Thread(target=_drain, args=(proc.stdout, stdout_chunks), daemon=True),
+        threading.Thread(target=_drain, args=(proc.stderr, stderr_chunks), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
     try:
-        result = subprocess.run(
-            cmd,
-            input=frame_input,
-            capture_output=True,
-            check=True,
-            text=False,
-            env=env,
-        )
+        try:
+            for frame_path in frame_paths:
+                proc.stdin.write(frame_path.encode("utf-8") + b"\n")
+            proc.stdin.close()
+        except BrokenPipeError:
+            # Child exited early; the failure surfaces via the return code below.
+            pass
 
-        # Forward any native logs (stderr) to our stderr for dev visibility.
-        if result.stderr:
-            stderr_text = result.stderr.decode("utf-8", errors="replace").strip()
-            if stderr_text:
-                print(stderr_text, file=sys.stderr)
-                reid_lines = [
-                    line for line in stderr_text.splitlines()
-                    if line.startswith("ReID:")
-                ]
-                if reid_lines:
-                    print("ReID summary:", file=sys.stderr)
-                    for line in reid_lines:
-                        print(f"  {line}", file=sys.stderr)
-        
-        # Parse JSON output
-        output_text = result.stdout.decode("utf-8")
-        tracking_data = json.loads(output_text)
-        
-        print(f"Found {len(tracking_data.get('tracks', []))} tracks", file=sys.stderr)
-        return tracking_data
-        
-    except subprocess.CalledProcessError as e:
-        error_msg = e.stderr.decode("utf-8") if e.stderr else "Unknown error"
-        raise RuntimeError(f"face_pipeline failed: {error_msg}") from e
-    except json.JSONDecodeError as e:
+        for reader in readers:
+            reader.join()
+        returncode = proc.wait()
+    except BaseException:
+        # The frame iterator failed mid-stream (e.g. a frame write error
+        # surfaced in extract_frames): don't leak the child process waiting
+        # on stdin - kill and reap it before propagating.
+        proc.kill()
+        proc.wait()
+        raise
+
+    # Forward any native logs (stderr) to our stderr for dev visibility.
+    stderr_text = b"".join(stderr_chunks).decode("utf-8", errors="replace").strip()
+    if stderr_text:
+        print(stderr_text, file=sys.stderr)
+        reid_lines = [
+            line for line in stderr_text.splitlines()
+            if line.startswith("ReID:")
+        ]
+        if reid_lines:
+            print("ReID summary:", file=sys.stderr)
+            for line in reid_lines:
+                print(f"  {line}", file=sys.stderr)
+
+    if returncode != 0:
+        raise RuntimeError(f"face_pipeline failed: {stderr_text or 'Unknown error'}")
+
+    # Parse JSON output
+    try:
+        tracking_data = _loads_tracking(b"".join(stdout_chunks))
+    except ValueError as e:
         raise RuntimeError(f"Failed to parse face_pipeline output: {e}") from e
 
+    print(f"Found {len(tracking_data.get('tracks', []))} tracks", file=sys.stderr)
+    return tracking_data
+
 
 # -----------------------------------------------------------------------------
 # Video Rendering
 # -----------------------------------------------------------------------------
 
-def _draw_hollow_rectangle(
-    frame: Any,  # numpy array
-    x1: int,
-    y1: int,
-    x2: int,
-    y2: int,
-    color: Tuple[int, int, int],
-    thickness: int,
-) -> None:
-    """Draw a hollow rectangle on the frame."""
-    import cv2
-    
-    cv2.line(frame, (x1, y1), (x2, y1), color, thickness)
-    cv2.line(frame, (x1, y2), (x2, y2), color, thickness)
-    cv2.line(frame, (x1, y1), (x1, y2), color, thickness)
-    cv2.line(frame, (x2, y1), (x2, y2), color, thickness)
+# Codec preference order for the debug video writer.
+CODEC_PREFERENCE: List[str] = ["mp4v", "avc1", "XVID", "MJPG"]
+
+# Codec that last opened a VideoWriter successfully. Probing runs once per
+# process; later renders try the known-good codec first.
+_working_codec: str | None = None
+
+
+def _open_video_writer(output_path: str, fps: float, width: int, height: int) -> Any:
+    """Open a cv2.VideoWriter, probing CODEC_PREFERENCE and caching the winner.
+
+    Returns the opened writer, or None if no codec worked.
+    """
+    global _working_codec
+    cv2 = _require_cv2()
+
+    candidates = list(CODEC_PREFERENCE)
+    if _working_codec in candidates:
+        candidates.remove(_working_codec)
+        candidates.insert(0, _working_codec)
+
+    for codec in candidates:
+        out = None
+        try:
+            fourcc = cv2.VideoWriter_fourcc(*codec)
+            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            if out.isOpened():
+                print(f"Using codec: {codec}", file=sys.stderr)
+                _working_codec = codec
+                return out
+            out.release()
+        except Exception as e:
+            if out:
+                out.release()
+            print(f"Codec {codec} failed: {e}", file=sys.stderr)
+    return None
+
+
+# getTextSize results keyed by label length. Labels are "ID:<n> (<conf>)" in
+# FONT_HERSHEY_SIMPLEX, whose digits/punctuation are near fixed-width at this
+# scale, so equal-length labels measure the same.
+_label_size_cache: Dict[int, Tuple[int, int]] = {}
+
+
+def _label_size(label: str) -> Tuple[int, int]:
+    """Measure a label, memoizing by length to avoid per-face getTextSize."""
+    cv2 = _require_cv2()
+
+    size = _label_size_cache.get(len(label))
+    if size is None:
+        size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        _label_size_cache[len(label)] = size
+    return size
 
 
 def render_debug_video(
-    video_path: str,
+    frame_paths: List[str],
     tracking_data: Dict[str, Any],
     output_path: str,
     fps: float,
@@ -255,22 +443,20 @@ def render_debug_video(
     height: int,
 ) -> None:
     """Render debug video with face bounding boxes overlaid.
-    
+
+    Reads the raw BGR frames already extracted by extract_frames rather than
+    re-opening and re-decoding the source video a second time.
+
     Args:
-        video_path: Input video path
+        frame_paths: Raw BGR frame dumps, in frame order
         tracking_data: JSON tracking data from face_pipeline
         output_path: Output video path
         fps: Video FPS
         width: Video width
         height: Video height
     """
-    try:
-        import cv2
-    except ImportError as e:
-        raise RuntimeError(
-            "opencv-python is not installed. Install with: pip install opencv-python"
-        ) from e
-    
+    cv2 = _require_cv2()
+
     # Ensure output directory exists and is writable
     output_dir = Path(output_path).parent
     try:
@@ -289,56 +475,46 @@ def render_debug_video(
     except Exception as e:
         raise RuntimeError(f"Cannot create output directory {output_dir}: {e}") from e
     
-    # Build frame index -> tracks mapping
+    # Build frame index -> tracks mapping with one NumPy sort/split rather than
+    # appending to per-frame Python lists entry by entry.
     # tracks: [{"id": 0, "frames": [{"frameIndex": 0, "bbox": [x1, y1, x2, y2], "confidence": 0.9}]}]
-    frame_tracks: Dict[int, List[Dict[str, Any]]] = {}
-    
+    frame_idx_list: List[int] = []
+    track_id_list: List[int] = []
+    conf_list: List[float] = []
+    bbox_list: List[List[float]] = []
+
     for track in tracking_data.get("tracks", []):
         track_id = track["id"]
-        color = FACE_COLORS[track_id % len(FACE_COLORS)]
-        
         for frame_data in track.get("frames", []):
-            frame_idx = frame_data["frameIndex"]
-            if frame_idx not in frame_tracks:
-                frame_tracks[frame_idx] = []
-            
-            frame_tracks[frame_idx].append({
-                "track_id": track_id,
-                "bbox": frame_data["bbox"],  # Normalized [x1, y1, x2, y2]
-                "confidence": frame_data.get("confidence", 0.0),
-                "color": color,
-            })
-    
-    # Open input video
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Failed to open video: {video_path}")
-    
-    # Create output video writer
-    # Try multiple codecs in order of preference
-    codecs = ["mp4v", "avc1", "XVID", "MJPG"]
-    out = None
-    fourcc = None
-    
-    for codec in codecs:
-        try:
-            fourcc = cv2.VideoWriter_fourcc(*codec)
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            if out.isOpened():
-                print(f"Using codec: {codec}", file=sys.stderr)
-                break
-            else:
-                if out:
-                    out.release()
-                out = None
-        except Exception as e:
-            if out:
-                out.release()
-                out = None
-            print(f"Codec {codec} failed: {e}", file=sys.stderr)
-            continue
-    
-    if out is None or not out.isOpened():
+            frame_idx_list.append(frame_data["frameIndex"])
+            track_id_list.append(track_id)
+            conf_list.append(frame_data.get("confidence", 0.0))
+            bbox_list.append(frame_data["bbox"])  # Normalized [x1, y1, x2, y2]
+
+    # Per-frame arrays: {"track_ids": (M,), "coords": (M, 4) px, "confidences": (M,)}
+    frame_tracks: Dict[int, Dict[str, Any]] = {}
+    if frame_idx_list:
+        frame_idx = np.asarray(frame_idx_list, dtype=np.int64)
+        track_ids = np.asarray(track_id_list, dtype=np.int64)
+        confidences = np.asarray(conf_list, dtype=np.float32)
+
+        # Convert all normalized bboxes to pixels in one vectorized pass.
+        scale = np.array([width, height, width, height], dtype=np.float32)
+        coords = (np.asarray(bbox_list, dtype=np.float32) * scale).astype(np.int32)
+
+        order = np.argsort(frame_idx, kind="stable")
+        unique_frames, starts = np.unique(frame_idx[order], return_index=True)
+        for fidx, sel in zip(unique_frames.tolist(), np.split(order, starts[1:])):
+            frame_tracks[fidx] = {
+                "track_ids": track_ids[sel],
+                "coords": coords[sel],
+                "confidences": confidences[sel],
+            }
+    
+    # Create output video writer (codec probe result is cached across calls)
+    out = _open_video_writer(output_path, fps, width, height)
+
+    if out is None:
         # Try with .avi extension as fallback
         if output_path.endswith('.mp4'):
             avi_path = output_path.replace('.mp4', '.avi')
@@ -353,45 +529,60 @@ def render_debug_video(
                     out.release()
                 raise RuntimeError(
                     f"Failed to create output video: {output_path}. "
-                    f"Tried codecs: {', '.join(codecs)}. "
+                    f"Tried codecs: {', '.join(CODEC_PREFERENCE)}. "
                     f"Your OpenCV build may not support these codecs."
                 )
         else:
             raise RuntimeError(
                 f"Failed to create output video: {output_path}. "
-                f"Tried codecs: {', '.join(codecs)}. "
+                f"Tried codecs: {', '.join(CODEC_PREFERENCE)}. "
                 f"Your OpenCV build may not support these codecs."
             )
     
-    frame_count = 0
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-    
+    rendered = 0
+    total_frames = len(frame_paths)
+
+    # Read each raw dump into one preallocated buffer instead of allocating a
+    # fresh frame per iteration; the writer consumes the frame synchronously,
+    # so reuse is safe here.
+    frame_buf = np.empty((height, width, 3), dtype=np.uint8)
+
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        for frame_count, frame_path in enumerate(frame_paths):
+            with open(frame_path, "rb") as f:
+                n = f.readinto(frame_buf)
+            if n != frame_buf.nbytes:
+                raise RuntimeError(
+                    f"Raw frame {frame_path} is truncated "
+                    f"({n} of {frame_buf.nbytes} bytes)"
+                )
+            frame = frame_buf
             
             # Draw bounding boxes for this frame
             if frame_count in frame_tracks:
-                for track_info in frame_tracks[frame_count]:
-                    bbox_norm = track_info["bbox"]
-                    color = track_info["color"]
-                    track_id = track_info["track_id"]
-                    confidence = track_info["confidence"]
-                    
-                    # Convert normalized coordinates to pixels
-                    x1 = int(bbox_norm[0] * width)
-                    y1 = int(bbox_norm[1] * height)
-                    x2 = int(bbox_norm[2] * width)
-                    y2 = int(bbox_norm[3] * height)
-                    
-                    # Draw bounding box
-                    _draw_hollow_rectangle(frame, x1, y1, x2, y2, color, BORDER_THICKNESS)
-                    
+                group = frame_tracks[frame_count]
+                coords = group["coords"]
+                track_ids = group["track_ids"].tolist()
+                confs = group["confidences"].tolist()
+
+                # Batch the hollow rectangles into one polylines call per
+                # color instead of four cv2.line calls per face.
+                boxes_by_color: Dict[Tuple[int, int, int], List[Any]] = {}
+                for track_id, (x1, y1, x2, y2) in zip(track_ids, coords):
+                    color = FACE_COLORS[track_id % len(FACE_COLORS)]
+                    corners = np.array(
+                        [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32
+                    )
+                    boxes_by_color.setdefault(color, []).append(corners)
+                for color, polys in boxes_by_color.items():
+                    cv2.polylines(frame, polys, True, color, BORDER_THICKNESS)
+
+                for track_id, confidence, (x1, y1, x2, y2) in zip(track_ids, confs, coords):
+                    color = FACE_COLORS[track_id % len(FACE_COLORS)]
+
                     # Draw track ID and confidence
                     label = f"ID:{track_id} ({confidence:.2f})"
-                    label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+                    label_size = _label_size(label)
                     label_y = max(y1 - 5, label_size[1] + 5)
                     
                     # Draw label background
@@ -414,18 +605,17 @@ def render_debug_video(
                     )
             
             out.write(frame)
-            frame_count += 1
-            
-            if frame_count % 30 == 0:
-                progress = (frame_count / total_frames * 100.0) if total_frames > 0 else 0.0
+            rendered += 1
+
+            if rendered % 30 == 0:
+                progress = (rendered / total_frames * 100.0) if total_frames > 0 else 0.0
                 print(
-                    f"Rendering frame {frame_count}/{total_frames} ({progress:.1f}%)",
+                    f"Rendering frame {rendered}/{total_frames} ({progress:.1f}%)",
                     file=sys.stderr,
                 )
     finally:
-        cap.release()
         out.release()
-        print(f"Completed rendering {frame_count} frames", file=sys.stderr)
+        print(f"Completed rendering {rendered} frames", file=sys.stderr)
 
 
 # -----------------------------------------------------------------------------
@@ -458,33 +648,39 @@ def run_test(
         temp_path = Path(temp_dir)
         print(f"Extracting frames to {temp_path}...", file=sys.stderr)
         
-        frame_paths, fps, width, height = extract_frames(video_path, temp_path)
-        
-        if len(frame_paths) == 0:
-            raise ValueError("No frames extracted from video")
-        
-        # Run face pipeline
+        frame_iter, fps, width, height = extract_frames(video_path, temp_path)
+
+        # Record paths as they stream past so they remain available for
+        # --keep-frames after the pipeline has consumed the iterator.
+        frame_paths: List[str] = []
+
+        def recorded_frames() -> Iterator[str]:
+            for frame_path in frame_iter:
+                frame_paths.append(frame_path)
+                yield frame_path
+
+        # Run face pipeline (extraction overlaps the C++ stage via streaming)
         tracking_data = run_face_pipeline(
-            frame_paths=frame_paths,
+            frame_paths=recorded_frames(),
             model_dir=model_dir,
             reid_model_dir=reid_dir,
             video_fps=fps,
             detection_fps=detection_fps,
             conf_thresh=conf_thresh,
             iou_thresh=iou_thresh,
+            raw_size=(width, height),
         )
-        
+
         # Save tracking data for debugging
         tracking_output_path = output_dir / "tracking_output.json"
-        with open(tracking_output_path, 'w') as f:
-            import json as json_module
-            json_module.dump(tracking_data, f, indent=2)
+        _dump_tracking(tracking_data, tracking_output_path)
         print(f"Saved tracking data to {tracking_output_path}", file=sys.stderr)
         
-        # Render debug video
+        # Render debug video from the frames extracted above (no second decode
+        # of the source video)
         print(f"Rendering debug video to {output_path}...", file=sys.stderr)
         render_debug_video(
-            video_path=video_path,
+            frame_paths=frame_paths,
             tracking_data=tracking_data,
             output_path=output_path,
             fps=fps,
@@ -492,14 +688,16 @@ def run_test(
             height=height,
         )
         
-        # Optionally keep frames
+        # Optionally keep frames. The extracted frames are headerless raw BGR
+        # dumps, so re-encode them to PNG here (off the hot path) to keep them
+        # viewable.
         if keep_frames:
+            cv2 = _require_cv2()
             frames_dir = Path(output_path).parent / f"{Path(output_path).stem}_frames"
             frames_dir.mkdir(exist_ok=True)
             for frame_path in frame_paths:
-                frame_name = Path(frame_path).name
-                import shutil
-                shutil.copy2(frame_path, frames_dir / frame_name)
+                frame = np.fromfile(frame_path, dtype=np.uint8).reshape(height, width, 3)
+                cv2.imwrite(str(frames_dir / f"{Path(frame_path).stem}.png"), frame)
             print(f"Frames saved to {frames_dir}", file=sys.stderr)
     
     print(f"Success! Output video: {output_path}", file=sys.stderr)
@@ -540,7 +738,7 @@ def main() -> None:
     parser.add_argument(
         "--keep-frames",
         action="store_true",
-        help="Keep extracted frames in output directory",
+        help="Keep extracted frames (re-encoded as PNG) in output directory",
     )
     
     args = parser.parse_args()